@@ -1,17 +1,88 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, Response
-from datetime import timedelta
-from supabase import create_client, Client
+from flask import Flask, render_template, request, redirect, url_for, session, flash, Response, jsonify, send_from_directory
+from datetime import datetime, timedelta, timezone
+from supabase import create_client, Client, ClientOptions
+from openpyxl import Workbook
 import pandas as pd
 import os
+import re
+import io
+import csv
 import json
+import time
+import tempfile
+import threading
+import hashlib
+import heapq
+import gzip
+import mimetypes
+import httpx
+import itertools
+from collections import defaultdict, deque, OrderedDict
+from urllib.parse import quote
 from dotenv import load_dotenv
 
+try:
+    import brotli
+except ImportError: # .br variants are skipped without the Brotli package
+    brotli = None
+
 load_dotenv()
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
+app.secret_key = os.environ.get('SECRET_KEY') or os.urandom(24) # Set SECRET_KEY to share sessions across gunicorn workers
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=15)
 
+# --- Database Resilience ---
+# All Supabase traffic goes through one httpx client, so every call gets a
+# DB_TIMEOUT budget and passes through the circuit breaker below.
+# After DB_BREAKER_THRESHOLD consecutive failures the breaker opens and calls
+# fail immediately for DB_BREAKER_COOLDOWN seconds; then one probe call is let
+# through and its outcome closes or re-opens the breaker.
+
+DB_TIMEOUT = float(os.environ.get('SUPABASE_TIMEOUT', 5)) # seconds per call
+DB_BREAKER_THRESHOLD = 3
+DB_BREAKER_COOLDOWN = 15 # seconds
+
+class DatabaseUnavailable(httpx.TransportError):
+    pass
+
+_breaker = {'failures': 0, 'opened_at': None, 'probing': False}
+_breaker_lock = threading.Lock()
+
+def _breaker_allow():
+    with _breaker_lock:
+        if _breaker['opened_at'] is None:
+            return True
+        if _breaker['probing'] or time.monotonic() - _breaker['opened_at'] < DB_BREAKER_COOLDOWN:
+            return False
+        _breaker['probing'] = True # Half-open: this call is the probe
+        return True
+
+def _breaker_record(ok):
+    with _breaker_lock:
+        _breaker['probing'] = False
+        if ok:
+            _breaker['failures'] = 0
+            _breaker['opened_at'] = None
+        else:
+            _breaker['failures'] += 1
+            # A failed probe re-opens the breaker straight away
+            if _breaker['opened_at'] is not None or _breaker['failures'] >= DB_BREAKER_THRESHOLD:
+                _breaker['opened_at'] = time.monotonic()
+
+class BreakerTransport(httpx.HTTPTransport):
+    def handle_request(self, request):
+        if not _breaker_allow():
+            raise DatabaseUnavailable("Database temporarily unavailable", request=request)
+        try:
+            response = super().handle_request(request)
+        except httpx.TransportError:
+            _breaker_record(False) # Timeouts and connection errors
+            raise
+        # 5xx means the backend is struggling; 4xx is still an answer
+        _breaker_record(response.status_code < 500)
+        return response
+
 # Supabase Setup
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
@@ -20,7 +91,89 @@ if not url or not key:
     print("Warning: SUPABASE_URL and SUPABASE_KEY must be set in .env file")
     supabase = None
 else:
-    supabase: Client = create_client(url, key)
+    http_client = httpx.Client(transport=BreakerTransport(), timeout=DB_TIMEOUT, follow_redirects=True)
+    supabase: Client = create_client(url, key, options=ClientOptions(httpx_client=http_client))
+
+# --- Static Assets ---
+# At startup every file in static/ is copied to static/build/ under a content
+# hashed name (js/script.js -> build/js/script.3f9a1c2b7d.js), with .gz and .br
+# variants next to it. url_for('static', ...) resolves to the hashed name, so a
+# URL never changes content and browsers may cache it for a year.
+
+ASSET_BUILD_DIR = 'build'
+ASSET_MAX_AGE = 31536000 # one year
+COMPRESSIBLE_ASSETS = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+
+_asset_manifest = {} # 'js/script.js' -> 'build/js/script.3f9a1c2b7d.js'
+_asset_variants = {} # 'build/js/script.3f9a1c2b7d.js' -> {'br': '....js.br', 'gzip': '....js.gz'}
+
+def _write_asset(path, data):
+    # Names are content hashes, so an existing file (e.g. from another worker) is already right
+    if os.path.exists(path): return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def build_static_assets():
+    static_root = app.static_folder
+    for folder, dirs, files in os.walk(static_root):
+        if folder == static_root and ASSET_BUILD_DIR in dirs:
+            dirs.remove(ASSET_BUILD_DIR)
+        for name in files:
+            if name.startswith('.'): continue
+            source = os.path.join(folder, name)
+            filename = os.path.relpath(source, static_root).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+
+            stem, ext = os.path.splitext(filename)
+            hashed = f"{ASSET_BUILD_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+            _write_asset(os.path.join(static_root, hashed), data)
+
+            variants = {}
+            if ext in COMPRESSIBLE_ASSETS:
+                compressed = {'gzip': (gzip.compress(data, 9, mtime=0), '.gz')}
+                if brotli:
+                    compressed['br'] = (brotli.compress(data), '.br')
+                for encoding, (body, suffix) in compressed.items():
+                    if len(body) < len(data):
+                        _write_asset(os.path.join(static_root, hashed + suffix), body)
+                        variants[encoding] = hashed + suffix
+
+            _asset_variants[hashed] = variants
+            _asset_manifest[filename] = hashed
+
+try:
+    build_static_assets()
+except OSError as e:
+    # Anything not built is served unhashed with the default headers
+    print(f"Error building static assets: {e}")
+
+@app.url_defaults
+def hashed_static_url(endpoint, values):
+    # Templates keep calling url_for('static', filename=...) and get the hashed file.
+    # In debug mode edits to static/ show up without a restart, so serve the originals.
+    if endpoint == 'static' and not app.debug:
+        values['filename'] = _asset_manifest.get(values.get('filename'), values.get('filename'))
+
+def serve_static(filename):
+    if filename not in _asset_variants:
+        return app.send_static_file(filename)
+
+    # Smallest precompressed variant the browser accepts
+    variants = _asset_variants[filename]
+    encoding = next((e for e in ('br', 'gzip') if e in variants and request.accept_encodings[e]), None)
+    response = send_from_directory(app.static_folder, variants[encoding] if encoding else filename,
+                                   mimetype=mimetypes.guess_type(filename)[0], max_age=ASSET_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    return response
+
+app.view_functions['static'] = serve_static
 
 @app.route('/')
 def landing():
@@ -48,42 +201,233 @@ def login():
             
     return render_template('landing.html', login_mode=True)
 
+# --- Season / League Registry ---
+# NOTE: User must create this table in Supabase:
+# create table seasons (id bigint generated always as identity primary key, league text not null default 'pes-super-league', slug text not null unique, name text not null, sort_order int not null default 0, is_current boolean default false, champion text, created_at timestamptz default now());
+# insert into seasons (league, slug, name, sort_order, is_current, champion) values ('pes-super-league', 'season1', 'Season 1', 1, false, 'Christo shaju'), ('pes-super-league', 'season2', 'Season 2', 2, false, null), ('pes-super-league', 'season3', 'Season 3', 3, true, null);
+# Until the table has rows for DEFAULT_LEAGUE, the registry falls back to DEFAULT_SEASONS for it.
+
+DEFAULT_LEAGUE = 'pes-super-league'
+DEFAULT_SEASONS = [
+    {'league': DEFAULT_LEAGUE, 'slug': 'season1', 'name': 'Season 1', 'sort_order': 1, 'is_current': False, 'champion': 'Christo shaju'},
+    {'league': DEFAULT_LEAGUE, 'slug': 'season2', 'name': 'Season 2', 'sort_order': 2, 'is_current': False, 'champion': None},
+    {'league': DEFAULT_LEAGUE, 'slug': 'season3', 'name': 'Season 3', 'sort_order': 3, 'is_current': True, 'champion': None}
+]
+
+SEASON_REGISTRY_TTL = 60 # seconds
+SEASON_DATA_TTL = 30 # seconds; also bounds staleness across gunicorn workers
+SEASON_RETRY_INTERVAL = 5 # seconds a stale snapshot is served before the next refresh attempt
+SEASON_CACHE_SIZE = 16 # seasons kept in memory; the least recently read one is dropped first
+
+_season_registry = {'expires': 0, 'seasons': None}
+# season slug -> {'expires', 'fetched_at', 'stale', 'data': {'teams': [...], 'fixtures': [...]}}
+# One partition per season, least recently read first; an expired partition is
+# kept as the last good snapshot until it is evicted
+_season_partitions = OrderedDict()
+_season_locks = {} # season slug -> lock held while that season is being fetched
+# season slug -> version set on invalidation so in-flight refreshes are discarded.
+# Versions are never reused, so dropping one with its season can't revive a stale fetch.
+_season_versions = {}
+_version_counter = itertools.count(1)
+
+def get_seasons(league=None):
+    # Registry rows, newest season first, optionally for one league
+    now = time.monotonic()
+    if _season_registry['seasons'] is None or now >= _season_registry['expires']:
+        seasons = None
+        if supabase:
+            try:
+                seasons = supabase.table('seasons').select('*').order('sort_order').execute().data
+            except Exception as e:
+                print(f"Error fetching season registry: {e}")
+                seasons = _season_registry['seasons'] # Keep the last good registry
+        seasons = seasons or []
+        # Other leagues (e.g. seeded synthetic ones) must not hide the original league
+        if not any(s['league'] == DEFAULT_LEAGUE for s in seasons):
+            seasons = DEFAULT_SEASONS + seasons
+        _season_registry['seasons'] = seasons
+        _season_registry['expires'] = now + SEASON_REGISTRY_TTL
+
+    seasons = [s for s in _season_registry['seasons'] if league is None or s['league'] == league]
+    return sorted(seasons, key=lambda s: s['sort_order'], reverse=True)
+
+def get_season(slug):
+    return next((s for s in get_seasons() if s['slug'] == slug), None)
+
+def current_season(league=DEFAULT_LEAGUE):
+    seasons = get_seasons(league)
+    return next((s for s in seasons if s.get('is_current')), seasons[0] if seasons else None)
+
+def current_seasons():
+    # The current season of every league
+    leagues = dict.fromkeys(s['league'] for s in get_seasons())
+    return [season for season in map(current_season, leagues) if season]
+
+def previous_season(slug):
+    season = get_season(slug)
+    if not season: return None
+    older = [s for s in get_seasons(season['league']) if s['sort_order'] < season['sort_order']]
+    return older[0] if older else None
+
+def invalidate_registry():
+    _season_registry['expires'] = 0
+
+def invalidate_season(season):
+    # Force the next read to refetch, but keep the snapshot as a fallback
+    _season_versions[season] = next(_version_counter)
+    entry = _season_partitions.get(season)
+    if entry:
+        entry['expires'] = 0
+
+def _mark_stale(entry):
+    # Serve the snapshot as-is for a while; after that the next request
+    # retries in the background instead of blocking on the database
+    entry['stale'] = True
+    entry['expires'] = time.monotonic() + SEASON_RETRY_INTERVAL
+
+def _evict_seasons():
+    # Keep at most SEASON_CACHE_SIZE partitions, dropping the least recently read
+    # along with their race status, then forget locks and versions of seasons no
+    # longer cached. Anything with a fetch or calculation in flight is left alone.
+    def busy(locks, season):
+        lock = locks.get(season)
+        return lock is not None and lock.locked()
+
+    excess = len(_season_partitions) - SEASON_CACHE_SIZE
+    for season in list(_season_partitions):
+        if excess <= 0: break
+        if busy(_season_locks, season) or busy(_race_locks, season): continue
+        _season_partitions.pop(season, None)
+        _race_cache.pop(season, None)
+        excess -= 1
+
+    for season in set(_season_locks) | set(_season_versions) | set(_race_cache) | set(_race_locks):
+        if season in _season_partitions or busy(_season_locks, season): continue
+        _season_locks.pop(season, None)
+        _season_versions.pop(season, None)
+        if not busy(_race_locks, season):
+            _race_cache.pop(season, None)
+            _race_locks.pop(season, None)
+
+def _season_snapshot(entry):
+    return dict(entry['data'], stale=entry['stale'], as_of=entry['fetched_at'])
+
+def _fetch_season(season):
+    version = _season_versions.get(season)
+    teams = supabase.table('teams').select('*').eq('season', season).order('points', desc=True).execute().data
+    fixtures = supabase.table('fixtures').select('*').eq('season', season).order('id').execute().data
+
+    # Clinch / elimination status is filled in off the request path
+    attach_race_status(season, teams, fixtures)
+
+    entry = {
+        'expires': time.monotonic() + SEASON_DATA_TTL,
+        'fetched_at': datetime.now().isoformat(timespec='seconds'),
+        'stale': False,
+        'data': {'teams': teams, 'fixtures': fixtures}
+    }
+    # Don't overwrite data invalidated by a write that landed mid-fetch
+    if version == _season_versions.get(season):
+        _season_partitions[season] = entry
+        _season_partitions.move_to_end(season)
+        _evict_seasons()
+    return entry
+
+def _refresh_season_in_background(season):
+    lock = _season_locks.setdefault(season, threading.Lock())
+    if not lock.acquire(blocking=False):
+        return # Another request is already refreshing this season
+
+    def run():
+        try:
+            _fetch_season(season)
+        except Exception as e:
+            print(f"Error refreshing {season}: {e}")
+            _mark_stale(_season_partitions[season])
+        finally:
+            lock.release()
+
+    threading.Thread(target=run, daemon=True).start()
+
+def get_season_data(season):
+    # Teams and fixtures for one season, cached independently of every other season.
+    # Stale-while-revalidate: an expired partition is served while one background
+    # thread refreshes it. If the database can't be reached the last good snapshot
+    # is returned with stale=True; only a season never fetched before raises.
+    entry = _season_partitions.get(season)
+    if entry:
+        try:
+            _season_partitions.move_to_end(season) # Most recently read
+        except KeyError:
+            pass # Evicted in the meantime; the snapshot in hand is still good
+    if entry and entry['expires'] > time.monotonic():
+        return _season_snapshot(entry)
+    if entry and entry['expires']:
+        _refresh_season_in_background(season)
+        return _season_snapshot(entry)
+
+    # Cold or invalidated: fetch now, one request per season at a time
+    with _season_locks.setdefault(season, threading.Lock()):
+        entry = _season_partitions.get(season)
+        if entry and entry['expires'] > time.monotonic():
+            return _season_snapshot(entry)
+        try:
+            return _season_snapshot(_fetch_season(season))
+        except Exception as e:
+            if not entry: raise
+            print(f"Error fetching {season}, serving last snapshot: {e}")
+            _mark_stale(entry)
+            return _season_snapshot(entry)
+
+def cached_team(team_id):
+    # A team row from any cached season, for when the database is unreachable
+    for entry in list(_season_partitions.values()):
+        team = next((t for t in entry['data']['teams'] if t['id'] == team_id), None)
+        if team: return team
+    return None
+
+@app.route('/api/seasons')
+def seasons_api():
+    return jsonify(get_seasons(request.args.get('league')))
+
+@app.route('/api/seasons/<season>')
+def season_data_api(season):
+    if not get_season(season):
+        return jsonify({'error': 'Season not found'}), 404
+    if not supabase:
+        return jsonify({'teams': [], 'fixtures': []})
+    try:
+        return jsonify(get_season_data(season))
+    except DatabaseUnavailable as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/points')
 def points():
-    # Fetch data from Supabase to pass to the frontend
-    if not supabase:
+    # Only the selected season is embedded; the page fetches others from /api/seasons/<season>
+    league = request.args.get('league', DEFAULT_LEAGUE)
+    seasons = get_seasons(league)
+    current = current_season(league)
+    selected = request.args.get('season', current['slug'] if current else None)
+    if selected not in [s['slug'] for s in seasons]:
+        selected = current['slug'] if current else None
+
+    league_data = {}
+    if selected:
         # Fallback empty structure if DB not connected
-        league_data = {"season1": {"teams": [], "fixtures": []}, "season2": {"teams": [], "fixtures": []}}
-    else:
-        try:
-            # Fetch teams
-            teams_response = supabase.table('teams').select("*").execute()
-            teams = teams_response.data
-            
-            # Fetch fixtures
-            fixtures_response = supabase.table('fixtures').select("*").execute()
-            fixtures = fixtures_response.data
-            
-            # Organize by season
-            league_data = {
-                "season1": {
-                    "teams": [t for t in teams if t['season'] == 'season1'],
-                    "fixtures": [f for f in fixtures if f['season'] == 'season1']
-                },
-                "season2": {
-                    "teams": [t for t in teams if t['season'] == 'season2'],
-                    "fixtures": [f for f in fixtures if f['season'] == 'season2']
-                },
-                "season3": {
-                    "teams": [t for t in teams if t['season'] == 'season3'],
-                    "fixtures": [f for f in fixtures if f['season'] == 'season3']
-                }
-            }
-        except Exception as e:
-            print(f"Error fetching data: {e}")
-            league_data = {"season1": {"teams": [], "fixtures": []}, "season2": {"teams": [], "fixtures": []}, "season3": {"teams": [], "fixtures": []}}
+        league_data[selected] = {"teams": [], "fixtures": []}
+        if supabase:
+            try:
+                league_data[selected] = get_season_data(selected)
+            except Exception as e:
+                print(f"Error fetching data: {e}")
+                league_data[selected]['unavailable'] = True
 
-    return render_template('index.html', league_data=json.dumps(league_data))
+    return render_template('index.html', league_data=json.dumps(league_data), seasons=seasons, selected_season=selected)
+
+# Knockout rounds are excluded from the league table
+KNOCKOUT_ROUNDS = ['SF1', 'SF2', 'Final', 'QF1', 'QF2', 'QF3', 'QF4']
 
 # Helper to re-calculate league table from fixtures
 def calculate_standings(season):
@@ -110,7 +454,7 @@ def calculate_standings(season):
     # 2. Aggregate stats from fixtures
     for f in fixtures:
         # Exclude Knockout Stages from League Table
-        if str(f['round']) in ['SF1', 'SF2', 'Final', 'QF1', 'QF2', 'QF3', 'QF4']:
+        if str(f['round']) in KNOCKOUT_ROUNDS:
             continue
 
         home = f['home_team']
@@ -160,7 +504,309 @@ def calculate_standings(season):
 
     if updates:
         supabase.table('teams').upsert(updates).execute()
+    invalidate_season(season)
+
+
+# --- Clinch / Elimination Calculator ---
+# Every game whose best result is obvious is settled first (a team that is past
+# us, or can't pass us any more, wins its games), so the exact search only
+# branches on games between borderline teams. Every search node, the first one
+# included, is tested against the max-flow (baseball elimination) relaxation, and
+# only branches when the flow can't settle it. If the search still runs out of
+# budget the team is reported 'unknown' rather than guessed.
+
+KNOCKOUT_SPOTS = 4 # Top-4 qualify for the knockout stage
+MATCH_OUTCOMES = [(3, 0), (0, 3), (1, 1)]
+RACE_NODE_BUDGET = 20000 # search nodes per team and question
+RACE_TIME_BUDGET = 5 # seconds per season
+
+# season -> (signature, status) so the calculator only reruns when results change
+_race_cache = {}
+_race_locks = {} # season slug -> lock held while its status is being calculated
+
+class RaceBudgetExceeded(Exception):
+    pass
+
+def _max_flow(graph, source, sink):
+    # Edmonds-Karp on a residual graph (dict of dicts), graph is consumed
+    flow = 0
+    while True:
+        parent = {source: None}
+        queue = deque([source])
+        while queue and sink not in parent:
+            u = queue.popleft()
+            for v, cap in graph[u].items():
+                if cap > 0 and v not in parent:
+                    parent[v] = u
+                    queue.append(v)
+        if sink not in parent:
+            return flow
+
+        bottleneck = None
+        v = sink
+        while parent[v] is not None:
+            u = parent[v]
+            bottleneck = graph[u][v] if bottleneck is None else min(bottleneck, graph[u][v])
+            v = u
+
+        v = sink
+        while parent[v] is not None:
+            u = parent[v]
+            graph[u][v] -= bottleneck
+            graph[v][u] = graph[v].get(u, 0) + bottleneck
+            v = u
+        flow += bottleneck
+
+def _game_counts(games):
+    counts = defaultdict(int)
+    for home, away in games:
+        counts[home] += 1
+        counts[away] += 1
+    return counts
+
+def _games_fit(games, room, free, capped=frozenset()):
+    # Flow relaxation of avoiding elimination: every game hands 2 units to its
+    # teams (1 each for a draw, both to the winner, who really scores 3). A team
+    # taking u units from g games scores at least u, or (3u - g) / 2 once u > g,
+    # which caps its units by its room; up to `free` teams not in `capped` may go
+    # past the cap. Returns None when no W/D/L result can work, otherwise the
+    # results read back off the flow, which are often already a way through.
+    counts = _game_counts(games)
+    cap = {n: r if r <= counts[n] else (2 * r + counts[n]) // 3 for n, r in room.items()}
+    spill = sorted((2 * counts[n] - cap[n] for n in room if n not in capped), reverse=True)
+    graph = defaultdict(dict)
+    for i, (home, away) in enumerate(games):
+        graph['source'][('game', i)] = 2
+        graph[('game', i)][('team', home)] = 2
+        graph[('game', i)][('team', away)] = 2
+    for n in room:
+        graph[('team', n)]['sink'] = cap[n]
+        if n not in capped:
+            graph[('team', n)]['spill'] = 2 * counts[n] - cap[n]
+    graph['spill']['sink'] = sum(spill[:free])
+    if _max_flow(graph, 'source', 'sink') < 2 * len(games):
+        return None
+    units = [graph[('team', home)].get(('game', i), 0) for i, (home, away) in enumerate(games)]
+    return [{2: (3, 0), 1: (1, 1), 0: (0, 3)}[u] for u in units]
+
+def _needs_reachable(games, need, wanted):
+    # Flow relaxation of rivals catching up: every game hands out at most 3
+    # points and a team is only helped up to its need, so the `wanted` smallest
+    # needs must fit in the flow. False means no W/D/L result can work.
+    graph = defaultdict(dict)
+    for i, (home, away) in enumerate(games):
+        graph['source'][('game', i)] = 3
+        graph[('game', i)][('team', home)] = 3
+        graph[('game', i)][('team', away)] = 3
+    for n, k in need.items():
+        graph[('team', n)]['sink'] = k
+    return _max_flow(graph, 'source', 'sink') >= sum(sorted(need.values())[:wanted])
+
+def _spend(nodes, deadline):
+    nodes[0] += 1
+    if nodes[0] > RACE_NODE_BUDGET or time.monotonic() > deadline:
+        raise RaceBudgetExceeded()
+
+def _can_avoid_elimination(games, room, free, deadline):
+    # Is there a W/D/L result where at most `free` teams gain more than their room?
+    failed = set()
+    nodes = [0]
+
+    def search(games, room, free, capped):
+        # Teams already past us, or that can't pass any more, win their games:
+        # it costs them nothing and keeps points away from everyone else
+        while True:
+            counts = _game_counts(games)
+            settled = {n for n, r in room.items() if r < 0 or r >= 3 * counts[n]}
+            if not settled:
+                break
+            passed = {n for n in settled if room[n] < 0}
+            free -= len(passed)
+            if free < 0 or passed & capped:
+                return False
+            room = {n: r for n, r in room.items() if n not in settled}
+            games = [g for g in games if g[0] not in settled and g[1] not in settled]
+        if len(room) <= free:
+            return True
+
+        capped = capped & room.keys()
+        key = (tuple(sorted(games)), tuple(sorted(room.items())), free, frozenset(capped))
+        if key in failed:
+            return False
+        _spend(nodes, deadline)
+        results = _games_fit(games, room, free, capped)
+        if results is not None:
+            final = dict(room)
+            for (home, away), (home_pts, away_pts) in zip(games, results):
+                final[home] -= home_pts
+                final[away] -= away_pts
+            if sum(1 for r in final.values() if r < 0) <= free:
+                return True
+
+            uncapped = [n for n in room if n not in capped]
+            if free and uncapped:
+                # Settle the team with the least room first: let it past, or hold it to its room
+                n = min(uncapped, key=room.get)
+                if search([g for g in games if n not in g], {m: r for m, r in room.items() if m != n}, free - 1, capped):
+                    return True
+                if search(games, room, free, capped | {n}):
+                    return True
+            else:
+                # Branch on a game of the team with the least room, trying the flow's result first
+                i = min(range(len(games)), key=lambda i: min(room[games[i][0]], room[games[i][1]]))
+                home, away = games[i]
+                rest = games[:i] + games[i + 1:]
+                for home_pts, away_pts in sorted(MATCH_OUTCOMES, key=lambda o: (o != results[i], -min(room[home] - o[0], room[away] - o[1]))):
+                    if search(rest, dict(room, **{home: room[home] - home_pts, away: room[away] - away_pts}), free, capped):
+                        return True
+        failed.add(key)
+        return False
+
+    return search(games, room, free, frozenset())
+
+def _can_rivals_catch_up(games, need, wanted, deadline):
+    # Is there a W/D/L result where at least `wanted` teams each gain their need?
+    failed = set()
+    nodes = [0]
+
+    def search(games, need, wanted):
+        # Teams that have caught up, or never can, lose their games: it costs
+        # them nothing and hands the most points to everyone else
+        while True:
+            counts = _game_counts(games)
+            settled = {n for n, k in need.items() if k <= 0 or k > 3 * counts[n]}
+            if not settled:
+                break
+            wanted -= sum(1 for n in settled if need[n] <= 0)
+            need = {n: k for n, k in need.items() if n not in settled}
+            for home, away in games:
+                if home in settled and away in need: need[away] -= 3
+                if away in settled and home in need: need[home] -= 3
+            games = [g for g in games if g[0] not in settled and g[1] not in settled]
+        if wanted <= 0:
+            return True
+        if len(need) < wanted:
+            return False
+
+        key = (tuple(sorted(games)), tuple(sorted(need.items())), wanted)
+        if key in failed:
+            return False
+        _spend(nodes, deadline)
+        if _needs_reachable(games, need, wanted):
+            # Branch on a game of the team closest to catching up, helping it first
+            home, away = min(games, key=lambda g: min(need[g[0]], need[g[1]]))
+            rest = list(games)
+            rest.remove((home, away))
+            for home_pts, away_pts in sorted(MATCH_OUTCOMES, key=lambda o: -(min(o[0], need[home]) / need[home] + min(o[1], need[away]) / need[away])):
+                if search(rest, dict(need, **{home: need[home] - home_pts, away: need[away] - away_pts}), wanted):
+                    return True
+        failed.add(key)
+        return False
+
+    return search(games, need, wanted)
 
+def _race_outcome(team, points, games, spots, deadline=float('inf')):
+    # 'clinched', 'eliminated' or 'alive' for finishing in the top `spots`, and
+    # 'unknown' when the search ran out of budget before it could tell
+    rivals = [n for n in points if n != team]
+    if spots > len(rivals):
+        return 'clinched'
+
+    own_games = [g for g in games if team in g]
+    other_games = [g for g in games if team not in g]
+
+    # Eliminated: even winning out, `spots` rivals must finish above us
+    best = points[team] + 3 * len(own_games)
+    try:
+        eliminated = not _can_avoid_elimination(other_games, {n: best - points[n] for n in rivals}, spots - 1, deadline)
+    except RaceBudgetExceeded:
+        eliminated = None
+    if eliminated:
+        return 'eliminated'
+
+    # Clinched: even losing out, `spots` rivals can't all finish level or above us
+    base = {n: points[n] for n in rivals}
+    for home, away in own_games:
+        base[away if home == team else home] += 3
+    try:
+        clinched = not _can_rivals_catch_up(other_games, {n: points[team] - base[n] for n in rivals}, spots, deadline)
+    except RaceBudgetExceeded:
+        clinched = None
+    if clinched:
+        return 'clinched'
+    return 'alive' if eliminated is False and clinched is False else 'unknown'
+
+def _race_signature(teams, fixtures):
+    points = {t['name']: t['points'] or 0 for t in teams}
+    games = [
+        (f['home_team'], f['away_team']) for f in fixtures
+        if f['status'] != 'Completed'
+        and str(f['round']) not in KNOCKOUT_ROUNDS
+        and f['home_team'] in points and f['away_team'] in points
+        and f['home_team'] != f['away_team']
+    ]
+    return points, games, (tuple(sorted(points.items())), tuple(sorted(games)))
+
+def calculate_race_status(season, teams, fixtures):
+    # Per team: first place and top-4 status, each 'clinched' / 'eliminated' / 'alive' / 'unknown'
+    points, games, signature = _race_signature(teams, fixtures)
+    cached = _race_cache.get(season)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    deadline = time.monotonic() + RACE_TIME_BUDGET
+    status = {
+        name: {
+            'first': _race_outcome(name, points, games, 1, deadline),
+            'top': _race_outcome(name, points, games, KNOCKOUT_SPOTS, deadline)
+        }
+        for name in points
+    }
+    _race_cache[season] = (signature, status)
+    return status
+
+def attach_race_status(season, teams, fixtures):
+    # Set t['race'] on every team: straight away if the status is known for these
+    # results, otherwise from a background thread (None until it finishes)
+    def attach(status):
+        for t in teams:
+            t['race'] = status.get(t['name'])
+
+    signature = _race_signature(teams, fixtures)[2]
+    cached = _race_cache.get(season)
+    attach(cached[1] if cached and cached[0] == signature else {})
+    if cached and cached[0] == signature:
+        return
+
+    lock = _race_locks.setdefault(season, threading.Lock())
+    if not lock.acquire(blocking=False):
+        return # Already being calculated; the next fetch picks up the result
+
+    def run():
+        try:
+            attach(calculate_race_status(season, teams, fixtures))
+        except Exception as e:
+            print(f"Error calculating race status for {season}: {e}")
+        finally:
+            lock.release()
+
+    threading.Thread(target=run, daemon=True).start()
+
+def _cell_date(value):
+    # Excel date cell (or text) -> 'YYYY-MM-DD', None if blank or unreadable
+    if value is None or pd.isna(value): return None
+    parsed = pd.to_datetime(value, errors='coerce')
+    return None if pd.isna(parsed) else parsed.strftime('%Y-%m-%d')
+
+def _cell_time(value):
+    # Excel time cell (or text like '19:30') -> 'HH:MM', None if blank or unreadable
+    if value is None or pd.isna(value): return None
+    if hasattr(value, 'strftime'): return value.strftime('%H:%M')
+    match = re.fullmatch(r'(\d{1,2})[:.](\d{2})(?::\d{2})?', str(value).strip())
+    return f"{int(match.group(1)):02d}:{match.group(2)}" if match else None
+
+ADMIN_PAGE_SIZE = 50
+ADMIN_MAX_PAGE_SIZE = 200
 
 @app.route('/admin', methods=['GET', 'POST'])
 def admin():
@@ -187,6 +833,7 @@ def admin():
                     }
                     supabase.table('teams').update(data).eq('id', t_id).execute()
                 
+                invalidate_season(request.args.get('season'))
                 flash("League table updated manually!", "success")
                 
             elif action == 'update_fixture':
@@ -221,48 +868,68 @@ def admin():
                         'played': 0, 'won': 0, 'drawn': 0, 'lost': 0,
                         'gf': 0, 'ga': 0, 'points': 0, 'form': ''
                     }).execute()
+                    invalidate_season(season)
                     flash(f"Team '{team_name}' added to {season}!", "success")
                 else:
                     flash("Missing team name or season.", "error")
 
-            elif action == 'import_season1':
-                # Fetch Season 1 teams
-                s1_teams = supabase.table('teams').select('*').eq('season', 'season1').execute().data
-                
-                # Insert them as Season 2 teams (reset stats)
-                for team in s1_teams:
-                    existing = supabase.table('teams').select('id').eq('season', 'season2').eq('name', team['name']).execute().data
-                    if not existing:
-                        supabase.table('teams').insert({
-                            'name': team['name'],
-                            'season': 'season2',
-                            'played': 0, 'won': 0, 'drawn': 0, 'lost': 0,
-                            'gf': 0, 'ga': 0, 'points': 0, 'form': ''
-                        }).execute()
-                
-                flash("Season 1 teams imported to Season 2 successfully!", "success")
+            elif action == 'import_teams':
+                source = request.form.get('source_season')
+                season = request.form.get('season')
+                source_info, target_info = get_season(source), get_season(season)
+                if source_info and target_info:
+                    # Insert source season teams into the target season (reset stats)
+                    source_teams = supabase.table('teams').select('name').eq('season', source).execute().data
+                    existing = {t['name'] for t in supabase.table('teams').select('name').eq('season', season).execute().data}
+                    new_teams = [{
+                        'name': team['name'],
+                        'season': season,
+                        'played': 0, 'won': 0, 'drawn': 0, 'lost': 0,
+                        'gf': 0, 'ga': 0, 'points': 0, 'form': ''
+                    } for team in source_teams if team['name'] not in existing]
 
-            elif action == 'import_season2':
-                # Fetch Season 2 teams
-                s2_teams = supabase.table('teams').select('*').eq('season', 'season2').execute().data
-                
-                # Insert them as Season 3 teams (reset stats)
-                for team in s2_teams:
-                    existing = supabase.table('teams').select('id').eq('season', 'season3').eq('name', team['name']).execute().data
-                    if not existing:
-                        supabase.table('teams').insert({
-                            'name': team['name'],
-                            'season': 'season3',
-                            'played': 0, 'won': 0, 'drawn': 0, 'lost': 0,
-                            'gf': 0, 'ga': 0, 'points': 0, 'form': ''
-                        }).execute()
-                
-                flash("Season 2 teams imported to Season 3 successfully!", "success")
+                    if new_teams:
+                        supabase.table('teams').insert(new_teams).execute()
+                    invalidate_season(season)
+                    flash(f"{source_info['name']} teams imported to {target_info['name']} successfully!", "success")
+                else:
+                    flash("Unknown season.", "error")
+
+            elif action == 'add_season':
+                league = re.sub(r'[^a-z0-9]+', '-', (request.form.get('league') or '').lower()).strip('-') or DEFAULT_LEAGUE
+                name = (request.form.get('season_name') or '').strip()
+                slug = re.sub(r'[^a-z0-9]+', '', name.lower())
+                # Teams and fixtures are keyed by slug alone, so other leagues get a prefix
+                if slug and league != DEFAULT_LEAGUE:
+                    slug = f"{league}-{slug}"
+                if not slug:
+                    flash("Missing season name.", "error")
+                elif get_season(slug):
+                    flash(f"Season '{slug}' already exists.", "error")
+                else:
+                    league_seasons = get_seasons(league)
+                    make_current = request.form.get('make_current') == 'on'
+                    # First write to the original league: store its built-in seasons too
+                    if league == DEFAULT_LEAGUE and not supabase.table('seasons').select('slug').eq('league', league).execute().data:
+                        supabase.table('seasons').upsert(DEFAULT_SEASONS, on_conflict='slug').execute()
+                    if make_current:
+                        supabase.table('seasons').update({'is_current': False}).eq('league', league).execute()
+                    supabase.table('seasons').insert({
+                        'league': league,
+                        'slug': slug,
+                        'name': name,
+                        'sort_order': max((s['sort_order'] for s in league_seasons), default=0) + 1,
+                        'is_current': make_current
+                    }).execute()
+                    invalidate_registry()
+                    flash(f"{name} added!", "success")
+                    return redirect(url_for('admin', season=slug))
 
             elif action == 'delete_team':
                 team_id = request.form.get('team_id')
                 if team_id:
                     supabase.table('teams').delete().eq('id', team_id).execute()
+                    invalidate_season(request.args.get('season'))
                     flash("Team deleted successfully.", "success")
 
             elif action == 'delete_fixture':
@@ -294,7 +961,7 @@ def admin():
                     try:
                         df = pd.read_excel(file)
                         # Expected columns: Round, Home Team, Away Team
-                        # Optional: Date, Time
+                        # Optional: Date, Time, Venue (dated fixtures show up in the calendar export)
                         
                         fixtures_to_insert = []
                         for index, row in df.iterrows():
@@ -310,11 +977,15 @@ def admin():
                                     "away_team": away_team,
                                     "home_score": None,
                                     "away_score": None,
-                                    "status": "Scheduled"
+                                    "status": "Scheduled",
+                                    "date": _cell_date(row.get('Date')),
+                                    "time": _cell_time(row.get('Time')),
+                                    "venue": None if pd.isna(row.get('Venue')) else str(row.get('Venue'))
                                 })
                         
                         if fixtures_to_insert:
                             supabase.table('fixtures').insert(fixtures_to_insert).execute()
+                            invalidate_season(season)
                             flash(f"{len(fixtures_to_insert)} fixtures imported successfully for {season}!", "success")
                         else:
                             flash("No valid fixtures found in file.", "warning")
@@ -400,6 +1071,7 @@ def admin():
                     
                     if new_fixtures:
                         supabase.table('fixtures').insert(new_fixtures).execute()
+                        invalidate_season(season)
                         flash(f"Generated {len(new_fixtures)} fixtures for {season}!", "success")
             
             elif action == 'approve_team_request':
@@ -417,38 +1089,86 @@ def admin():
         except Exception as e:
             flash(f"Error updating: {e}", "error")
         
-        return redirect(url_for('admin'))
+        return redirect(url_for('admin', season=request.args.get('season')))
+
+    # GET request - Render a single season; fixtures and team requests
+    # are fetched page by page by the dashboard from the JSON endpoints below
+    seasons = get_seasons()
+    season = request.args.get('season')
+    if not get_season(season):
+        current = current_season()
+        season = current['slug'] if current else None
 
-    # GET request - Fetch data for admin view
     try:
-        all_teams = supabase.table('teams').select('*').order('points', desc=True).execute().data
-        all_fixtures = supabase.table('fixtures').select('*').order('id', desc=False).execute().data
-        
-        # Separate by season
-        data = {
-            "season1": {
-                "teams": [t for t in all_teams if t['season'] == 'season1'],
-                "fixtures": [f for f in all_fixtures if f['season'] == 'season1']
-            },
-            "season2": {
-                "teams": [t for t in all_teams if t['season'] == 'season2'],
-                "fixtures": [f for f in all_fixtures if f['season'] == 'season2']
-            },
-            "season3": {
-                "teams": [t for t in all_teams if t['season'] == 'season3'],
-                "fixtures": [f for f in all_fixtures if f['season'] == 'season3']
-            }
-        }
-        
-        # Fetch pending team requests
-        team_requests = supabase.table('team_requests').select('*').order('created_at', desc=True).execute().data
-        
+        teams = supabase.table('teams').select('*').eq('season', season).order('points', desc=True).execute().data
     except Exception as e: # Catch specific exceptions if possible, e.g., Supabase errors
-        data = {"season1": {"teams": [], "fixtures": []}, "season2": {"teams": [], "fixtures": []}, "season3": {"teams": [], "fixtures": []}}
-        team_requests = []
+        teams = []
         flash(f"Error fetching admin data: {e}", "error")
-        
-    return render_template('admin.html', user=session['user'], data=data, team_requests=team_requests)
+
+    return render_template('admin.html', user=session['user'], season=season, season_info=get_season(season), seasons=seasons,
+                           teams=teams, import_source=previous_season(season), page_size=ADMIN_PAGE_SIZE)
+
+# --- Admin JSON Endpoints (keyset pagination) ---
+
+@app.route('/admin/api/<season>/fixtures')
+def admin_fixtures_api(season):
+    if 'user' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    after = request.args.get('after', type=int)
+    limit = max(1, min(request.args.get('limit', ADMIN_PAGE_SIZE, type=int), ADMIN_MAX_PAGE_SIZE))
+    # Strip characters that would break the PostgREST or() filter
+    search = re.sub(r'[,()*%"\\]', '', request.args.get('q', '')).strip()
+
+    try:
+        query = supabase.table('fixtures').select('*').eq('season', season)
+        if after is not None:
+            query = query.gt('id', after)
+        if search:
+            query = query.or_(f'home_team.ilike.*{search}*,away_team.ilike.*{search}*')
+        rows = query.order('id').limit(limit + 1).execute().data
+    except DatabaseUnavailable as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    # One extra row tells us whether there is another page
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({'fixtures': rows, 'next_after': rows[-1]['id'] if has_more else None})
+
+@app.route('/admin/api/team_requests')
+def admin_team_requests_api():
+    if 'user' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    before = request.args.get('before')
+    before_id = request.args.get('before_id')
+    # The cursor goes into a PostgREST filter string, so only accept a timestamp and an id
+    if before or before_id:
+        # Postgres timestamptz as PostgREST returns it, e.g. 2024-05-01T10:00:00.12345+00:00
+        if not re.fullmatch(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,6})?([+-]\d{2}(:?\d{2})?|Z)?', before or ''):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if not re.fullmatch(r'[0-9A-Fa-f-]{1,36}', before_id or ''):
+            return jsonify({'error': 'Invalid cursor'}), 400
+    limit = max(1, min(request.args.get('limit', ADMIN_PAGE_SIZE, type=int), ADMIN_MAX_PAGE_SIZE))
+
+    try:
+        # Never send password hashes to the browser
+        query = supabase.table('team_requests').select('id, team_name, email, status, created_at').eq('status', 'pending')
+        if before:
+            # Keyset on (created_at, id), newest first
+            query = query.or_(f'created_at.lt."{before}",and(created_at.eq."{before}",id.lt."{before_id}")')
+        rows = query.order('created_at', desc=True).order('id', desc=True).limit(limit + 1).execute().data
+    except DatabaseUnavailable as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = {'before': rows[-1]['created_at'], 'before_id': rows[-1]['id']} if has_more else None
+    return jsonify({'team_requests': rows, 'next': next_cursor})
 
 @app.route('/download_fixtures/<season>')
 def download_fixtures(season):
@@ -483,6 +1203,164 @@ def download_fixtures(season):
         
     return Response(pdf.output(dest='S').encode('latin-1'), mimetype='application/pdf', headers={'Content-Disposition':f'attachment;filename=fixtures_{season}.pdf'})
 
+# --- Streaming Fixture Exports (CSV / XLSX / iCalendar) ---
+# Fixtures are read page by page and written out as they arrive,
+# so memory stays flat however many fixtures a season has.
+
+EXPORT_PAGE_SIZE = 500
+EXPORT_COLUMNS = ['Round', 'Date', 'Time', 'Home Team', 'Away Team', 'Home Score', 'Away Score', 'Status', 'Venue']
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'ics': 'text/calendar'
+}
+
+def _iter_fixture_pages(season, column=None, value=None):
+    # Keyset pagination on id, optionally filtered on one column by the database
+    last_id = None
+    while True:
+        query = supabase.table('fixtures').select('*').eq('season', season)
+        if column:
+            query = query.eq(column, value)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        page = query.order('id').limit(EXPORT_PAGE_SIZE).execute().data
+        yield from page
+        if len(page) < EXPORT_PAGE_SIZE:
+            return
+        last_id = page[-1]['id']
+
+def _iter_fixtures(season, team_name=None):
+    # One team's matches are its home and away fixtures, merged back into id order
+    if team_name is None:
+        yield from _iter_fixture_pages(season)
+        return
+    last_id = None
+    for f in heapq.merge(_iter_fixture_pages(season, 'home_team', team_name),
+                         _iter_fixture_pages(season, 'away_team', team_name), key=lambda f: f['id']):
+        if f['id'] != last_id:
+            yield f
+        last_id = f['id']
+
+def _fixture_row(f):
+    return [f['round'], f.get('date') or '', f.get('time') or '', f['home_team'], f['away_team'],
+            f['home_score'], f['away_score'], f['status'], f.get('venue') or '']
+
+def _stream_csv(fixtures):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for f in fixtures:
+        writer.writerow(_fixture_row(f))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    yield buffer.getvalue()
+
+def _stream_xlsx(fixtures):
+    # Write-only workbooks flush rows to disk instead of keeping them in memory.
+    # Fixed sheet title: user input could contain characters Excel rejects.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title='Fixtures')
+    ws.append(EXPORT_COLUMNS)
+    for f in fixtures:
+        ws.append(_fixture_row(f))
+
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+def _ics_escape(text):
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _ics_line(line):
+    # RFC 5545: fold lines longer than 75 octets
+    data = line.encode('utf-8')
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        # Don't split a multi-byte character
+        while cut > 0 and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+    parts.append(data.decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+def _stream_ics(fixtures, calendar_name):
+    yield _ics_line('BEGIN:VCALENDAR')
+    yield _ics_line('VERSION:2.0')
+    yield _ics_line('PRODID:-//PES Super League//Fixtures//EN')
+    yield _ics_line('CALSCALE:GREGORIAN')
+    yield _ics_line(f'X-WR-CALNAME:{_ics_escape(calendar_name)}')
+
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    for f in fixtures:
+        # Only fixtures with a date can go on a calendar
+        try:
+            day = datetime.strptime(str(f.get('date')), '%Y-%m-%d')
+        except ValueError:
+            continue
+        try:
+            kickoff = datetime.strptime(str(f.get('time')), '%H:%M').time()
+        except ValueError:
+            kickoff = None
+
+        summary = f"{f['home_team']} vs {f['away_team']}"
+        if f['status'] == 'Completed' and f['home_score'] is not None and f['away_score'] is not None:
+            summary = f"{f['home_team']} {f['home_score']} - {f['away_score']} {f['away_team']}"
+
+        yield _ics_line('BEGIN:VEVENT')
+        yield _ics_line(f"UID:fixture-{f['id']}@pessuper")
+        yield _ics_line(f'DTSTAMP:{stamp}')
+        if kickoff:
+            start = datetime.combine(day.date(), kickoff)
+            yield _ics_line(f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}")
+            yield _ics_line(f"DTEND:{(start + timedelta(hours=1)).strftime('%Y%m%dT%H%M%S')}")
+        else:
+            yield _ics_line(f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}")
+            yield _ics_line(f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}")
+        yield _ics_line(f'SUMMARY:{_ics_escape(summary)}')
+        yield _ics_line(f"DESCRIPTION:{_ics_escape('Round ' + str(f['round']))}")
+        if f.get('venue'):
+            yield _ics_line(f"LOCATION:{_ics_escape(f['venue'])}")
+        yield _ics_line('END:VEVENT')
+
+    yield _ics_line('END:VCALENDAR')
+
+@app.route('/download_fixtures/<season>/<fmt>')
+def export_fixtures(season, fmt):
+    if not supabase: return "DB Error", 500
+    if fmt not in EXPORT_MIMETYPES: return "Unsupported format", 404
+    season_info = get_season(season)
+    if not season_info: return "Season not found", 404
+
+    # Optional ?team=<name> narrows the export to one club
+    team_name = request.args.get('team')
+    fixtures = _iter_fixtures(season, team_name)
+    label = f"{season}_{team_name.replace(' ', '_')}" if team_name else season
+
+    if fmt == 'csv':
+        body = _stream_csv(fixtures)
+    elif fmt == 'xlsx':
+        body = _stream_xlsx(fixtures)
+    else:
+        calendar_name = f"{team_name} - {season_info['name']}" if team_name else season_info['name']
+        body = _stream_ics(fixtures, calendar_name)
+
+    # Calendars are subscribed to, so serve them inline
+    disposition = 'inline' if fmt == 'ics' else 'attachment'
+    # ASCII fallback plus the exact name (RFC 6266) for clients that support it
+    filename = f"fixtures_{label}.{fmt}"
+    ascii_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', filename)
+    return Response(body, mimetype=EXPORT_MIMETYPES[fmt],
+                    headers={'Content-Disposition': f"{disposition}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"})
+
 # --- Team Authentication & Dashboard ---
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -497,12 +1375,14 @@ def team_register():
             flash("All fields are required", "error")
             return redirect(url_for('team_register'))
             
-        # Check if team exists in Season 2 (Validation)
+        # Check if team exists in the current season (Validation)
         # We allow registration only if team exists in teams table (case insensitive check recommended but strict here for now)
         try:
-            team_exists = supabase.table('teams').select('id').eq('name', team_name).eq('season', 'season2').execute().data
+            # Any league's current season will do
+            seasons = [s['slug'] for s in current_seasons()]
+            team_exists = supabase.table('teams').select('id').eq('name', team_name).in_('season', seasons).execute().data
             if not team_exists:
-                flash(f"Team '{team_name}' not found in Season 2. Please check spelling.", "error")
+                flash(f"Team '{team_name}' not found in any current season. Please check spelling.", "error")
                 return redirect(url_for('team_register'))
                 
             # Insert into team_requests table
@@ -579,7 +1459,10 @@ def team_dashboard():
     
     # Reuse the logic from team_analysis but strictly for this team
     try:
-        team_data = supabase.table('teams').select('*').eq('name', team_name).eq('season', 'season2').single().execute().data
+        # The team's current season, in whichever league it plays
+        seasons = [s['slug'] for s in current_seasons()]
+        rows = supabase.table('teams').select('*').eq('name', team_name).in_('season', seasons).execute().data
+        team_data = min(rows, key=lambda t: seasons.index(t['season'])) if rows else None
         if not team_data:
             return f"Error: Team '{team_name}' data not found. Please contact admin."
             
@@ -606,30 +1489,44 @@ def analysis_list_old(): # Renamed to avoid conflict with new analysis_list
         flash("Database connection failed", "error")
         return redirect(url_for('landing'))
     
-    # Fetch all teams from Season 2
-    teams = supabase.table('teams').select('*').eq('season', 'season2').order('name').execute().data
+    # Fetch all teams from the current season
+    season = current_season()
+    teams = supabase.table('teams').select('*').eq('season', season['slug']).order('name').execute().data if season else []
     return render_template('analysis_list.html', teams=teams)
 
 @app.route('/analysis/<int:team_id>')
 def team_analysis(team_id):
     if not supabase: return redirect(url_for('landing'))
     
-    # Get season from query parameter, default to season3
-    selected_season = request.args.get('season', 'season3')
+    # Get season from query parameter, default to the current season of the team's league
+    selected_season = request.args.get('season')
     
-    # 1. Get Team Details
-    team = supabase.table('teams').select('*').eq('id', team_id).single().execute().data
+    # 1. Get Team Details (from the season cache if the database is unreachable)
+    try:
+        team = supabase.table('teams').select('*').eq('id', team_id).single().execute().data
+    except httpx.TransportError as e:
+        print(f"Error fetching team {team_id}: {e}")
+        team = cached_team(team_id)
+    except Exception:
+        team = None
     if not team:
         flash("Team not found", "error")
         return redirect(url_for('analysis_list'))
         
     team_name = team['name']
     season = team['season']
+    if not selected_season:
+        current = current_season(get_season(season)['league'] if get_season(season) else DEFAULT_LEAGUE)
+        selected_season = current['slug'] if current else season
     
     # Check if user wants a different season view - redirect to a team in that season
     if selected_season != season:
         # Find the same team name in the selected season
-        alt_team = supabase.table('teams').select('*').eq('name', team_name).eq('season', selected_season).execute().data
+        try:
+            alt_team = [t for t in get_season_data(selected_season)['teams'] if t['name'] == team_name] if get_season(selected_season) else []
+        except Exception as e:
+            print(f"Error fetching {selected_season}: {e}")
+            alt_team = []
         if alt_team:
             return redirect(url_for('team_analysis', team_id=alt_team[0]['id'], season=selected_season))
         else:
@@ -640,7 +1537,13 @@ def team_analysis(team_id):
     # Supabase "or" syntax is a bit specific: .or_(f"home_team.eq.{team_name},away_team.eq.{team_name}")
     # But filtering by season first is good.
     # We will fetch all season fixtures and filter in python for simplicity and reliability with complex OR queries
-    all_season_fixtures = supabase.table('fixtures').select('*').eq('season', season).execute().data
+    try:
+        season_data = get_season_data(season)
+    except Exception as e:
+        print(f"Error fetching {season}: {e}")
+        flash("Live data is temporarily unavailable. Please try again shortly.", "error")
+        return redirect(url_for('landing'))
+    all_season_fixtures = season_data['fixtures']
     
     team_fixtures = [f for f in all_season_fixtures if f['home_team'] == team_name or f['away_team'] == team_name]
     
@@ -658,8 +1561,7 @@ def team_analysis(team_id):
     h2h = {}
     
     # Get all other teams to initialize
-    all_teams = supabase.table('teams').select('name').eq('season', season).execute().data
-    for t in all_teams:
+    for t in season_data['teams']:
         if t['name'] != team_name:
             h2h[t['name']] = {'played': 0, 'remaining': 0, 'results': []}
             
@@ -684,17 +1586,20 @@ def team_analysis(team_id):
             h2h[opponent]['remaining'] += 1
 
     # 5. League Context (To see position)
-    standings = supabase.table('teams').select('*').eq('season', season).order('points', desc=True).execute().data
+    standings = sorted(season_data['teams'], key=lambda t: t['points'] or 0, reverse=True)
     current_rank = next((i for i, t in enumerate(standings, 1) if t['id'] == team['id']), '-')
     leader_points = standings[0]['points'] if standings else 0
     points_to_leader = leader_points - current_points
+    race_status = next((t['race'] for t in standings if t['name'] == team_name), None)
     
-    # 6. Get available seasons for team (for season switcher) - exclude season1
-    available_seasons = []
-    for s in ['season3', 'season2']:
-        team_in_season = supabase.table('teams').select('id').eq('name', team_name).eq('season', s).execute().data
-        if team_in_season:
-            available_seasons.append(s)
+    # 6. Get available seasons for team (for season switcher), newest first
+    season_info = get_season(season)
+    try:
+        team_seasons = {t['season'] for t in supabase.table('teams').select('season').eq('name', team_name).execute().data}
+    except Exception as e:
+        print(f"Error fetching seasons for {team_name}: {e}")
+        team_seasons = {slug for slug, entry in list(_season_partitions.items()) if any(t['name'] == team_name for t in entry['data']['teams'])}
+    available_seasons = [s for s in get_seasons(season_info['league'] if season_info else None) if s['slug'] in team_seasons]
     
     return render_template('analysis_detail.html', 
                          team=team,
@@ -706,7 +1611,11 @@ def team_analysis(team_id):
                          current_rank=current_rank,
                          leader_points=leader_points,
                          points_to_leader=points_to_leader,
-                         available_seasons=available_seasons)
+                         race_status=race_status,
+                         season_info=season_info,
+                         knockout_spots=KNOCKOUT_SPOTS,
+                         available_seasons=available_seasons,
+                         stale_as_of=season_data['as_of'] if season_data['stale'] else None)
 
 @app.route('/logout')
 def logout():
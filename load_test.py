@@ -0,0 +1,412 @@
+"""Local load-testing harness for the league app.
+
+Starts app.py under gunicorn against an in-memory stand-in for Supabase
+(with injectable latency), drives a mix of public, team and admin traffic
+and reports throughput, p50/p95/p99 latency and error rate.
+
+    python load_test.py --workers 2 --threads 4 --concurrency 20 --duration 30 --db-latency-ms 40
+
+Each gunicorn worker gets its own copy of the data, so admin writes are not
+shared between workers. That is fine for measuring capacity.
+"""
+import argparse
+import copy
+import http.cookiejar
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from types import SimpleNamespace
+
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+from werkzeug.security import generate_password_hash
+
+SEASON = 'season3'
+SECRET_KEY = 'load-test' # shared by the workers, and lets the driver read flashed messages
+UNEXPECTED_RESPONSE = 598 # reported as an error: wrong redirect target or an error flash
+TEAM_EMAIL = 'loadtest@example.com'
+TEAM_PASSWORD = 'loadtest'
+ADMIN_EMAIL = 'admin@example.com'
+
+DEFAULT_MIX = 'points=60,analysis=25,team_login=10,admin_score=5'
+
+# --- Local Data Stand-in ---
+
+class LocalQuery:
+    # Just enough of the supabase-py query builder for app.py
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.columns = None
+        self.filters = []
+        self.orders = []
+        self.limit_count = None
+        self.is_single = False
+        self.operation = 'select'
+        self.payload = None
+
+    def select(self, columns='*'):
+        if columns.strip() != '*':
+            self.columns = [c.strip() for c in columns.split(',')]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) == str(value))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] < value)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def single(self):
+        self.is_single = True
+        return self
+
+    def insert(self, rows):
+        self.operation, self.payload = 'insert', rows
+        return self
+
+    def update(self, data):
+        self.operation, self.payload = 'update', data
+        return self
+
+    def upsert(self, rows):
+        self.operation, self.payload = 'upsert', rows
+        return self
+
+    def delete(self):
+        self.operation = 'delete'
+        return self
+
+    def execute(self):
+        self.db.wait()
+        with self.db.lock:
+            rows = self.db.tables.setdefault(self.table, [])
+            matched = [r for r in rows if all(f(r) for f in self.filters)]
+
+            if self.operation == 'insert':
+                new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+                for row in new_rows:
+                    rows.append(dict(row, id=self.db.next_id()))
+                return SimpleNamespace(data=new_rows)
+            if self.operation == 'upsert':
+                by_id = {r['id']: r for r in rows}
+                for row in self.payload:
+                    if row.get('id') in by_id:
+                        by_id[row['id']].update(row)
+                    else:
+                        rows.append(dict(row, id=self.db.next_id()))
+                return SimpleNamespace(data=self.payload)
+            if self.operation == 'update':
+                for row in matched:
+                    row.update(self.payload)
+                return SimpleNamespace(data=matched)
+            if self.operation == 'delete':
+                self.db.tables[self.table] = [r for r in rows if r not in matched]
+                return SimpleNamespace(data=matched)
+
+            for column, desc in reversed(self.orders):
+                matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            if self.limit_count is not None:
+                matched = matched[:self.limit_count]
+            if self.columns:
+                matched = [{c: r.get(c) for c in self.columns} for r in matched]
+            matched = copy.deepcopy(matched)
+
+        if self.is_single:
+            return SimpleNamespace(data=matched[0] if matched else None)
+        return SimpleNamespace(data=matched)
+
+class LocalAuth:
+    def sign_in_with_password(self, credentials):
+        return SimpleNamespace(user=SimpleNamespace(email=credentials['email']),
+                               session=SimpleNamespace(access_token='local'))
+
+    def sign_out(self):
+        pass
+
+class LocalSupabase:
+    def __init__(self, tables, latency_ms=0, jitter_ms=0):
+        self.tables = tables
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.lock = threading.Lock()
+        self.auth = LocalAuth()
+        self._id = max((r['id'] for rows in tables.values() for r in rows), default=0)
+
+    def next_id(self):
+        self._id += 1
+        return self._id
+
+    def wait(self):
+        # Simulated round trip to the database
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+def build_league(team_count, seed=0):
+    # One season, double round robin, first half of the rounds already played.
+    # Seeded so every worker and the driver generate the same ids.
+    rng = random.Random(seed)
+    names = [f"Team {i + 1}" for i in range(team_count)]
+    teams = [{
+        'id': i + 1, 'name': name, 'season': SEASON,
+        'played': 0, 'won': 0, 'drawn': 0, 'lost': 0,
+        'gf': 0, 'ga': 0, 'points': 0, 'form': ''
+    } for i, name in enumerate(names)]
+
+    fixtures = []
+    pairs = [(h, a) for h in names for a in names if h != a]
+    rng.shuffle(pairs)
+    for i, (home, away) in enumerate(pairs):
+        played = i < len(pairs) // 2
+        fixtures.append({
+            'id': 10000 + i, 'season': SEASON, 'round': str(i // max(team_count // 2, 1) + 1),
+            'home_team': home, 'away_team': away,
+            'home_score': rng.randint(0, 4) if played else None,
+            'away_score': rng.randint(0, 4) if played else None,
+            'status': 'Completed' if played else 'Scheduled',
+            'date': '2025-01-01', 'time': '19:00', 'venue': 'Basil Arena'
+        })
+
+    # Derive the table from the played fixtures
+    by_name = {t['name']: t for t in teams}
+    for f in fixtures:
+        if f['status'] != 'Completed':
+            continue
+        home, away = by_name[f['home_team']], by_name[f['away_team']]
+        for team, scored, conceded in ((home, f['home_score'], f['away_score']), (away, f['away_score'], f['home_score'])):
+            team['played'] += 1
+            team['gf'] += scored
+            team['ga'] += conceded
+            if scored > conceded:
+                team['won'] += 1
+                team['points'] += 3
+            elif scored == conceded:
+                team['drawn'] += 1
+                team['points'] += 1
+            else:
+                team['lost'] += 1
+
+    team_requests = [{
+        'id': 1, 'email': TEAM_EMAIL, 'team_name': names[0],
+        'password': generate_password_hash(TEAM_PASSWORD), 'status': 'approved',
+        'created_at': '2025-01-01T00:00:00+00:00'
+    }]
+    return {'teams': teams, 'fixtures': fixtures, 'team_requests': team_requests, 'seasons': []}
+
+def create_app():
+    # gunicorn entry point: "load_test:create_app()"
+    import app as league_app
+    league = build_league(int(os.environ.get('LOADTEST_TEAMS', 10)))
+    league_app.supabase = LocalSupabase(league,
+                                        float(os.environ.get('LOADTEST_DB_LATENCY_MS', 0)),
+                                        float(os.environ.get('LOADTEST_DB_JITTER_MS', 0)))
+    return league_app.app
+
+# --- Traffic ---
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Measure each request on its own; the redirect target is checked instead
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+def session_serializer():
+    # Same signing as the app's session cookie, so flashed messages can be read
+    app = Flask(__name__)
+    app.secret_key = SECRET_KEY
+    return SecureCookieSessionInterface().get_signing_serializer(app)
+
+class VirtualUser:
+    def __init__(self, base_url, team_ids, fixture_ids):
+        self.base_url = base_url
+        self.team_ids = team_ids
+        self.fixture_ids = fixture_ids
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), NoRedirect)
+        self.serializer = session_serializer()
+        self.admin_logged_in = False
+
+    def request(self, path, data=None, expect=None):
+        # The app reports most failures by flashing a message and redirecting, so
+        # a request that expects a redirect to `expect` fails on any other answer
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=30) as response:
+                response.read()
+                return response.status if expect is None else UNEXPECTED_RESPONSE
+        except urllib.error.HTTPError as e:
+            if 300 <= e.code < 400:
+                location = urllib.parse.urlsplit(e.headers.get('Location', ''))
+                target = location.path + (f"?{location.query}" if location.query else '')
+                return e.code if target == expect else UNEXPECTED_RESPONSE
+            return e.code
+        except (urllib.error.URLError, OSError):
+            return 599
+
+    def pop_flashes(self):
+        # Read and clear the messages flashed into the session cookie; nothing
+        # renders them here, so they would otherwise pile up in the cookie
+        for cookie in self.cookies:
+            if cookie.name == 'session':
+                data = self.serializer.loads(cookie.value)
+                flashes = data.pop('_flashes', [])
+                cookie.value = self.serializer.dumps(data)
+                return flashes
+        return []
+
+    def points(self):
+        return self.request('/points')
+
+    def analysis(self):
+        return self.request(f"/analysis/{random.choice(self.team_ids)}?season={SEASON}")
+
+    def team_login(self):
+        return self.request('/team/login', {'email': TEAM_EMAIL, 'password': TEAM_PASSWORD}, expect='/team/dashboard')
+
+    def admin_score(self):
+        if not self.admin_logged_in:
+            self.admin_logged_in = self.request('/login', {'email': ADMIN_EMAIL, 'password': 'local'}, expect='/admin') < 400
+        status = self.request(f"/admin?season={SEASON}", {
+            'action': 'update_fixture',
+            'match_id': random.choice(self.fixture_ids),
+            'home_score': random.randint(0, 4),
+            'away_score': random.randint(0, 4)
+        }, expect=f"/admin?season={SEASON}")
+        # Failed admin actions still redirect back to the dashboard, with an error flash
+        if status < 400 and any(category in ('error', 'danger') for category, _ in self.pop_flashes()):
+            return UNEXPECTED_RESPONSE
+        return status
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, weight = part.split('=')
+        if name.strip() not in ('points', 'analysis', 'team_login', 'admin_score'):
+            raise ValueError(f"Unknown traffic type: {name}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def run_load(base_url, mix, concurrency, duration, team_ids, fixture_ids):
+    results = [] # (kind, latency_seconds, status)
+    results_lock = threading.Lock()
+    kinds, weights = zip(*mix.items())
+    deadline = time.monotonic() + duration
+
+    def user_loop():
+        user = VirtualUser(base_url, team_ids, fixture_ids)
+        local = []
+        while time.monotonic() < deadline:
+            kind = random.choices(kinds, weights)[0]
+            start = time.perf_counter()
+            status = getattr(user, kind)()
+            local.append((kind, time.perf_counter() - start, status))
+        with results_lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=user_loop) for _ in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.monotonic() - started
+
+def report(results, elapsed):
+    print(f"\n{'traffic':<14}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>10}")
+    groups = {}
+    for kind, latency, status in results:
+        groups.setdefault(kind, []).append((latency, status))
+    groups['TOTAL'] = [(latency, status) for _, latency, status in results]
+
+    for kind, rows in groups.items():
+        latencies = sorted(latency * 1000 for latency, _ in rows)
+        errors = sum(1 for _, status in rows if status >= 400)
+        print(f"{kind:<14}{len(rows):>10}{len(rows) / elapsed:>10.1f}"
+              f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}{percentile(latencies, 99):>10.1f}"
+              f"{(errors / len(rows) if rows else 0):>9.1%}")
+
+def wait_until_ready(base_url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            with urllib.request.urlopen(base_url + '/', timeout=2):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not become ready in time")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument('--threads', type=int, default=1, help="threads per worker")
+    parser.add_argument('--concurrency', type=int, default=10, help="simultaneous virtual users")
+    parser.add_argument('--duration', type=float, default=20, help="seconds of traffic")
+    parser.add_argument('--db-latency-ms', type=float, default=30, help="latency added to every data call")
+    parser.add_argument('--db-jitter-ms', type=float, default=5, help="random +/- jitter on that latency")
+    parser.add_argument('--teams', type=int, default=10, help="teams in the generated league")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"traffic weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    # Same generated ids as the workers will have
+    league = build_league(args.teams)
+    team_ids = [t['id'] for t in league['teams']]
+    fixture_ids = [f['id'] for f in league['fixtures'] if f['status'] != 'Completed']
+
+    env = dict(os.environ,
+               SUPABASE_URL='', SUPABASE_KEY='',
+               SECRET_KEY=SECRET_KEY, # shared so sessions work across workers
+               LOADTEST_TEAMS=str(args.teams),
+               LOADTEST_DB_LATENCY_MS=str(args.db_latency_ms),
+               LOADTEST_DB_JITTER_MS=str(args.db_jitter_ms))
+    command = [sys.executable, '-m', 'gunicorn', 'load_test:create_app()',
+               '--workers', str(args.workers), '--threads', str(args.threads),
+               '--bind', f"127.0.0.1:{args.port}", '--log-level', 'warning']
+
+    print(f"Starting gunicorn: {args.workers} workers x {args.threads} threads, "
+          f"db latency {args.db_latency_ms}±{args.db_jitter_ms} ms")
+    process = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        wait_until_ready(base_url, process)
+        print(f"Driving {args.concurrency} virtual users for {args.duration:.0f}s ({args.mix})")
+        results, elapsed = run_load(base_url, mix, args.concurrency, args.duration, team_ids, fixture_ids)
+        report(results, elapsed)
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,39 @@
+"""Bulk loader for the league database.
+
+Loads the real Season 1 history and, with --scale, synthetic seasons of any
+size for staging. Rows are written in chunks with upserts keyed on natural
+keys, so the script can be re-run safely. Finished chunks are recorded in a
+checkpoint file, so a run that fails part-way resumes where it stopped.
+
+    python seed_db.py                      # Season 1 history only
+    python seed_db.py --scale 10           # + 10 synthetic seasons
+    python seed_db.py --scale 50 --teams 24 --chunk-size 1000
+
+NOTE: Upserts need these unique indexes in Supabase:
+create unique index if not exists teams_season_name on teams (season, name);
+create unique index if not exists fixtures_natural_key on fixtures (season, round, home_team, away_team);
+(seasons.slug is already unique, see app.py.)
+"""
 import os
+import json
+import time
+import random
+import argparse
 from supabase import create_client
+from postgrest.types import ReturnMethod
 from dotenv import load_dotenv
 
 load_dotenv()
 
-url = os.environ.get("SUPABASE_URL")
-key = os.environ.get("SUPABASE_KEY")
-
-if not url or not key:
-    print("Error: Supabase credentials not found in .env")
-    exit()
+CHECKPOINT_FILE = ".seed_checkpoint.json"
+SYNTHETIC_LEAGUE = "synthetic"
 
-supabase = create_client(url, key)
+# Natural keys used for idempotent upserts
+CONFLICT_KEYS = {
+    "seasons": "slug",
+    "teams": "season,name",
+    "fixtures": "season,round,home_team,away_team"
+}
 
 # --- Data from script.js ---
 
@@ -64,47 +86,209 @@ fixtures_knockout = [
     ["Christo shaju", "chris john George", 'Final', 3, 1]
 ]
 
-def seed():
-    print("Seeding Teams...")
-    try:
-        data = supabase.table("teams").select("*").execute()
-        if len(data.data) == 0:
-            supabase.table("teams").insert(teams_s1).execute()
-            print("Teams seeded.")
-        else:
-            print("Teams table already has data.")
-    except Exception as e:
-        print(f"Error seeding teams: {e}")
+# Registry rows for the original league, same as DEFAULT_SEASONS in app.py.
+# Once the seasons table has any row for this league the app stops falling
+# back to its defaults, so all three are written together.
+history_seasons = [
+    { "league": "pes-super-league", "slug": "season1", "name": "Season 1", "sort_order": 1, "is_current": False, "champion": "Christo shaju" },
+    { "league": "pes-super-league", "slug": "season2", "name": "Season 2", "sort_order": 2, "is_current": False, "champion": None },
+    { "league": "pes-super-league", "slug": "season3", "name": "Season 3", "sort_order": 3, "is_current": True, "champion": None }
+]
+
+# --- Datasets ---
+
+def history_rows():
+    # Real Season 1 data
+    fixtures = []
+    for f in fixtures_s1:
+        fixtures.append({
+            "home_team": f[0], "away_team": f[1],
+            "round": str(f[2]),
+            "home_score": f[3], "away_score": f[4],
+            "season": "season1", "status": "Completed",
+            "date": "2024-10-28", "time": "FT", "venue": "Basil Arena"
+        })
+    for f in fixtures_knockout:
+        fixtures.append({
+            "home_team": f[0], "away_team": f[1],
+            "round": str(f[2]),
+            "home_score": f[3], "away_score": f[4],
+            "season": "season1", "status": "Completed",
+            "date": "2024-12-20", "time": "FT", "venue": "Basil Arena"
+        })
+    return {"seasons": history_seasons, "teams": teams_s1, "fixtures": fixtures}
+
+def synthetic_season(index, team_count, played_ratio, seed):
+    # One synthetic season: double round robin, the first `played_ratio` of rounds completed.
+    # Seeded per season so every run produces identical rows (needed for resume).
+    rng = random.Random(f"{seed}-{index}")
+    slug = f"synthetic{index}"
+    names = [f"Synthetic {index}-{i + 1:03d}" for i in range(team_count)]
+
+    # Circle method, same as the admin fixture generator
+    rotation = names + ([None] if team_count % 2 else [])
+    n = len(rotation)
+    rounds = []
+    for r in range(n - 1):
+        rounds.append([(rotation[i], rotation[n - 1 - i]) for i in range(n // 2)
+                       if rotation[i] is not None and rotation[n - 1 - i] is not None])
+        rotation.insert(1, rotation.pop())
+    rounds += [[(away, home) for home, away in matches] for matches in rounds]
+
+    played_rounds = int(len(rounds) * played_ratio)
+    stats = {name: {"played": 0, "won": 0, "drawn": 0, "lost": 0, "gf": 0, "ga": 0, "points": 0, "form_list": []}
+             for name in names}
+    fixtures = []
+    for r_idx, matches in enumerate(rounds):
+        for home, away in matches:
+            completed = r_idx < played_rounds
+            h_score = rng.randint(0, 5) if completed else None
+            a_score = rng.randint(0, 5) if completed else None
+            fixtures.append({
+                "home_team": home, "away_team": away,
+                "round": str(r_idx + 1),
+                "home_score": h_score, "away_score": a_score,
+                "season": slug, "status": "Completed" if completed else "Scheduled",
+                "date": f"2025-{(r_idx // 4) % 12 + 1:02d}-{(r_idx % 4) * 7 + 1:02d}",
+                "time": "FT" if completed else "19:00", "venue": "Synthetic Arena"
+            })
+            if not completed:
+                continue
+            for team, scored, conceded in ((home, h_score, a_score), (away, a_score, h_score)):
+                s = stats[team]
+                s["played"] += 1
+                s["gf"] += scored
+                s["ga"] += conceded
+                if scored > conceded:
+                    s["won"] += 1
+                    s["points"] += 3
+                    s["form_list"].append("W")
+                elif scored == conceded:
+                    s["drawn"] += 1
+                    s["points"] += 1
+                    s["form_list"].append("D")
+                else:
+                    s["lost"] += 1
+                    s["form_list"].append("L")
+
+    teams = []
+    for name, s in stats.items():
+        form = "".join(s.pop("form_list")[-5:])
+        teams.append(dict(s, name=name, season=slug, form=form))
+
+    season = {"league": SYNTHETIC_LEAGUE, "slug": slug, "name": f"Synthetic {index}",
+              "sort_order": index, "is_current": False}
+    return {"seasons": [season], "teams": teams, "fixtures": fixtures}
+
+# --- Loader ---
+
+class CheckpointMismatch(Exception):
+    pass
+
+def load_checkpoint(path, params):
+    # Finished chunks of an earlier run, which must have generated the same rows
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        saved = json.load(f)
+    if not isinstance(saved, dict) or saved.get("params") != params:
+        raise CheckpointMismatch(f"{path} was written by a run with different options; "
+                                 "re-run with the same options or pass --fresh")
+    return set(saved["done"])
+
+def save_checkpoint(path, params, done):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"params": params, "done": sorted(done)}, f)
+    os.replace(tmp, path) # Atomic, so a crash never leaves a half-written checkpoint
+
+def upsert_chunks(supabase, table, rows, dataset, chunk_size, done, checkpoint, params, retries):
+    written = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        # Keyed on the row range, so a different --chunk-size can't skip unwritten rows
+        key = f"{dataset}:{table}:{start}-{start + len(chunk)}"
+        if key in done:
+            continue
+
+        for attempt in range(retries + 1):
+            try:
+                # Existing registry rows may have been edited by the admin; leave them alone
+                supabase.table(table).upsert(chunk, on_conflict=CONFLICT_KEYS[table],
+                                             ignore_duplicates=(table == "seasons"),
+                                             returning=ReturnMethod.minimal).execute()
+                break
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                wait = 2 ** attempt
+                print(f"  {key} failed ({e}), retrying in {wait}s...")
+                time.sleep(wait)
+
+        written += len(chunk)
+        done.add(key)
+        save_checkpoint(checkpoint, params, done)
+    return written
+
+def seed(supabase, scale=0, teams=20, played_ratio=0.5, chunk_size=500, seed_value=0,
+         checkpoint=CHECKPOINT_FILE, retries=3):
+    # Everything that changes the generated rows; chunk size is covered by range keys
+    params = {"scale": scale, "teams": teams, "played": played_ratio, "seed": seed_value}
+    done = load_checkpoint(checkpoint, params)
+    if done:
+        print(f"Resuming: {len(done)} chunks already loaded.")
+
+    datasets = [("history", history_rows)]
+    datasets += [(f"synthetic{i}", lambda i=i: synthetic_season(i, teams, played_ratio, seed_value))
+                 for i in range(1, scale + 1)]
+
+    for name, build in datasets:
+        rows = build()
+        # Registry rows first so the season is visible before its data arrives
+        for table in ("seasons", "teams", "fixtures"):
+            if rows.get(table):
+                written = upsert_chunks(supabase, table, rows[table], name, chunk_size, done, checkpoint, params, retries)
+                if written:
+                    print(f"{name}: {written} {table} rows upserted.")
+    print("Seeding complete.")
+
+    # A finished run needs no checkpoint; the next run starts clean
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load league data into Supabase.")
+    parser.add_argument("--scale", type=int, default=0, help="number of synthetic seasons to generate")
+    parser.add_argument("--teams", type=int, default=20, help="teams per synthetic season")
+    parser.add_argument("--played", type=float, default=0.5, help="fraction of rounds already played (0-1)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="rows per upsert request")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for synthetic data")
+    parser.add_argument("--retries", type=int, default=3, help="retries per chunk before giving up")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="resume file for partial runs")
+    parser.add_argument("--fresh", action="store_true", help="ignore any existing checkpoint")
+    args = parser.parse_args()
+
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+
+    if not url or not key:
+        print("Error: Supabase credentials not found in .env")
+        exit()
+
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
 
-    print("Seeding Fixtures...")
+    supabase = create_client(url, key)
     try:
-        data = supabase.table("fixtures").select("*").execute()
-        if len(data.data) == 0:
-            # Process fixtures
-            formatted_fixtures = []
-            for f in fixtures_s1:
-                formatted_fixtures.append({
-                    "home_team": f[0], "away_team": f[1], 
-                    "round": str(f[2]), 
-                    "home_score": f[3], "away_score": f[4],
-                    "season": "season1", "status": "Completed",
-                    "date": "2024-10-28", "time": "FT", "venue": "Basil Arena"
-                })
-            for f in fixtures_knockout:
-                formatted_fixtures.append({
-                    "home_team": f[0], "away_team": f[1], 
-                    "round": str(f[2]), 
-                    "home_score": f[3], "away_score": f[4],
-                    "season": "season1", "status": "Completed",
-                    "date": "2024-12-20", "time": "FT", "venue": "Basil Arena"
-                })
-            
-            supabase.table("fixtures").insert(formatted_fixtures).execute()
-            print("Fixtures seeded.")
-        else:
-            print("Fixtures table already has data.")
+        seed(supabase, scale=args.scale, teams=args.teams, played_ratio=args.played,
+             chunk_size=args.chunk_size, seed_value=args.seed, checkpoint=args.checkpoint, retries=args.retries)
+    except CheckpointMismatch as e:
+        print(f"Error: {e}")
+        exit(1)
     except Exception as e:
-        print(f"Error seeding fixtures: {e}")
+        print(f"Error seeding: {e}")
+        print(f"Progress saved to {args.checkpoint}; re-run the same command to resume.")
+        exit(1)
 
 if __name__ == "__main__":
-    seed()
+    main()
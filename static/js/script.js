@@ -1,61 +1,64 @@
 // --- 1. DATA STRUCTURE (DYNAMIC) ---
 
-let leagueData = {
-    season1: { teams: [], fixtures: [] },
-    season2: { teams: [], fixtures: [] },
-    season3: { teams: [], fixtures: [] }
+// Seasons come from the registry; only the selected season ships with the page,
+// the others are fetched from /api/seasons/<season> the first time they are opened.
+const seasons = window.seasonsBackend || [];
+const seasonInfo = Object.fromEntries(seasons.map(s => [s.slug, s]));
+
+let leagueData = {};
+
+const processTeams = (teams) => {
+    return teams.map(t => ({
+        name: t.name,
+        played: t.played,
+        won: t.won,
+        drawn: t.drawn,
+        lost: t.lost,
+        gf: t.gf || 0,
+        ga: t.ga || 0,
+        points: t.points,
+        form: t.form,
+        race: t.race,
+        gd: (t.gf || 0) - (t.ga || 0)
+    }));
 };
 
-if (window.leagueDataBackend) {
-    const backendData = window.leagueDataBackend;
-    console.log("Backend Data Loaded:", backendData);
+const processFixtures = (fixtures) => {
+    return fixtures.map(f => ({
+        round: f.round || f.fixtureNum,
+        date: f.date,
+        time: f.time,
+        home: f.home_team,
+        away: f.away_team,
+        venue: f.venue,
+        home_score: f.home_score,
+        away_score: f.away_score,
+        status: f.status
+    }));
+};
 
-    const processTeams = (teams) => {
-        return teams.map(t => ({
-            name: t.name,
-            played: t.played,
-            won: t.won,
-            drawn: t.drawn,
-            lost: t.lost,
-            gf: t.gf || 0,
-            ga: t.ga || 0,
-            points: t.points,
-            form: t.form,
-            gd: (t.gf || 0) - (t.ga || 0)
-        }));
+const storeSeason = (season, data) => {
+    leagueData[season] = {
+        teams: processTeams(data.teams || []),
+        fixtures: processFixtures(data.fixtures || []),
+        stale: data.stale,
+        asOf: data.as_of,
+        unavailable: data.unavailable
     };
+};
 
-    const processFixtures = (fixtures) => {
-        return fixtures.map(f => ({
-            round: f.round || f.fixtureNum,
-            date: f.date,
-            time: f.time,
-            home: f.home_team,
-            away: f.away_team,
-            venue: f.venue,
-            home_score: f.home_score,
-            away_score: f.away_score,
-            status: f.status
-        }));
-    };
+if (window.leagueDataBackend) {
+    const backendData = window.leagueDataBackend;
+    console.log("Backend Data Loaded:", backendData);
 
-    if (backendData.season1) {
-        leagueData.season1.teams = processTeams(backendData.season1.teams);
-        leagueData.season1.fixtures = processFixtures(backendData.season1.fixtures);
-    }
-    if (backendData.season2) {
-        leagueData.season2.teams = processTeams(backendData.season2.teams);
-        leagueData.season2.fixtures = processFixtures(backendData.season2.fixtures);
-    }
-    if (backendData.season3) {
-        leagueData.season3.teams = processTeams(backendData.season3.teams);
-        leagueData.season3.fixtures = processFixtures(backendData.season3.fixtures);
+    for (const [season, data] of Object.entries(backendData)) {
+        storeSeason(season, data);
     }
 } else {
     console.error("No backend data found! Check window.leagueDataBackend");
 }
 
-let currentSeason = 'season3';
+let currentSeason = window.selectedSeason;
 
 // --- LOGIC FUNCTIONS ---
 
@@ -72,11 +75,7 @@ const getSortedTeams = (season) => {
 
 // Render Points Table
 const renderPointsTable = (season) => {
-    let targetId = 'points-table-body';
-    if (season === 'season2') targetId = 'points-table-body-s2';
-    if (season === 'season3') targetId = 'points-table-body-s3';
-
-    const tableBody = document.getElementById(targetId);
+    const tableBody = document.getElementById(`points-table-body-${season}`);
     if (!tableBody) return;
 
     tableBody.innerHTML = '';
@@ -87,11 +86,13 @@ const renderPointsTable = (season) => {
         return;
     }
 
+    // Qualification highlight for seasons still without a champion
+    const showQualification = seasonInfo[season] && !seasonInfo[season].champion;
+
     teams.forEach((team, index) => {
         const row = document.createElement('tr');
 
-        // Highlight logic (Season 2 only for now, can extend to S3 if rules same)
-        if (season === 'season2') {
+        if (showQualification) {
             if (index === 0) row.classList.add('row-final');
             else if (index === 1 || index === 2) row.classList.add('row-semi');
         }
@@ -103,9 +104,17 @@ const renderPointsTable = (season) => {
             return `<div class="dot ${cls}">${char}</div>`;
         }).join('');
 
+        // Clinch / elimination badge (computed server-side)
+        let raceBadge = '';
+        if (team.race) {
+            if (team.race.first === 'clinched') raceBadge = '<span class="race-badge clinched" title="First place clinched">1st</span>';
+            else if (team.race.top === 'clinched') raceBadge = '<span class="race-badge clinched" title="Top 4 clinched">Q</span>';
+            else if (team.race.top === 'eliminated') raceBadge = '<span class="race-badge eliminated" title="Eliminated from top 4">E</span>';
+        }
+
         row.innerHTML = `
             <td>${index + 1}</td>
-            <td>${team.name}</td>
+            <td>${team.name}${raceBadge}</td>
             <td>${team.played}</td>
             <td>${team.won}</td>
             <td>${team.drawn}</td>
@@ -122,11 +131,7 @@ const renderPointsTable = (season) => {
 
 // Render Fixtures
 const renderFixtures = (season) => {
-    let targetId = 'fixtures-list';
-    if (season === 'season2') targetId = 'fixtures-list-s2';
-    if (season === 'season3') targetId = 'fixtures-list-s3';
-
-    const container = document.getElementById(targetId);
+    const container = document.getElementById(`fixtures-list-${season}`);
     if (!container) return;
 
     container.innerHTML = '';
@@ -181,11 +186,7 @@ const renderFixtures = (season) => {
 
 // Render Scorers
 const renderScorers = (season) => {
-    let targetId = 'top-scorers-list';
-    if (season === 'season2') targetId = 'top-scorers-list-s2';
-    if (season === 'season3') targetId = 'top-scorers-list-s3';
-
-    const container = document.getElementById(targetId);
+    const container = document.getElementById(`top-scorers-list-${season}`);
     if (!container) return;
 
     container.innerHTML = '';
@@ -217,29 +218,59 @@ const renderScorers = (season) => {
     });
 };
 
+// Warn when the server fell back to a snapshot or had no data at all
+const renderDataNotice = (season) => {
+    const notice = document.getElementById('data-notice');
+    if (!notice) return;
+
+    const data = leagueData[season] || {};
+    if (data.unavailable) {
+        notice.textContent = 'Live data is temporarily unavailable. Please try again shortly.';
+    } else if (data.stale) {
+        notice.textContent = `Live data is temporarily unavailable. Showing results as of ${(data.asOf || '').replace('T', ' ')}.`;
+    }
+    notice.classList.toggle('hidden', !(data.unavailable || data.stale));
+};
+
+const renderSeason = (season) => {
+    renderDataNotice(season);
+    renderPointsTable(season);
+    renderFixtures(season);
+    renderScorers(season);
+};
+
+// Fetch a season the first time it is opened
+const ensureSeasonLoaded = async (season) => {
+    // Seasons that failed to load are retried the next time they are opened
+    if (leagueData[season] && !leagueData[season].unavailable) {
+        renderDataNotice(season);
+        return;
+    }
+
+    const tableBody = document.getElementById(`points-table-body-${season}`);
+    if (tableBody) tableBody.innerHTML = '<tr><td colspan="11" style="text-align:center; padding: 20px;">Loading...</td></tr>';
+
+    try {
+        const response = await fetch(`${window.seasonApiUrl}/${encodeURIComponent(season)}`);
+        if (!response.ok) throw new Error(response.statusText);
+        storeSeason(season, await response.json());
+    } catch (err) {
+        console.error(`Error loading ${season}:`, err);
+        storeSeason(season, { unavailable: true });
+    }
+    renderSeason(season);
+};
+
 // --- INITIALIZE ---
 document.addEventListener('DOMContentLoaded', () => {
     console.log("Initializing App...");
 
-    // 1. Render All Data
-    renderPointsTable('season3');
-    renderFixtures('season3');
-    renderScorers('season3');
-
-    renderPointsTable('season2');
-    renderFixtures('season2');
-    renderScorers('season2');
-
-    renderPointsTable('season1');
-    renderFixtures('season1');
-    renderScorers('season1');
+    // 1. Render the embedded season
+    if (currentSeason && leagueData[currentSeason]) renderSeason(currentSeason);
 
     // 2. Setup Tab Listeners
     const seasonBtns = document.querySelectorAll('.season-button');
     const navBtns = document.querySelectorAll('.nav-button');
-    const s1Data = document.getElementById('season1-data');
-    const s2Data = document.getElementById('season2-data');
-    const s3Data = document.getElementById('season3-data');
 
     // Handle Season Switch
     seasonBtns.forEach(btn => {
@@ -251,15 +282,13 @@ document.addEventListener('DOMContentLoaded', () => {
             // Logic
             currentSeason = btn.dataset.season;
 
-            // Hide all
-            if (s1Data) s1Data.classList.add('hidden');
-            if (s2Data) s2Data.classList.add('hidden');
-            if (s3Data) s3Data.classList.add('hidden');
+            // Hide all, show current
+            seasons.forEach(s => {
+                const container = document.getElementById(`${s.slug}-data`);
+                if (container) container.classList.toggle('hidden', s.slug !== currentSeason);
+            });
 
-            // Show current
-            if (currentSeason === 'season1' && s1Data) s1Data.classList.remove('hidden');
-            else if (currentSeason === 'season2' && s2Data) s2Data.classList.remove('hidden');
-            else if (currentSeason === 'season3' && s3Data) s3Data.classList.remove('hidden');
+            ensureSeasonLoaded(currentSeason);
 
             // Reset to Table view when switching season
             navBtns[0].click();
@@ -275,23 +304,14 @@ document.addEventListener('DOMContentLoaded', () => {
 
             // Logic
             const targetBase = btn.dataset.target; // e.g. "points-table-section"
-
-            let container;
-            if (currentSeason === 'season1') container = s1Data;
-            else if (currentSeason === 'season2') container = s2Data;
-            else container = s3Data;
-
+            const container = document.getElementById(`${currentSeason}-data`);
             if (!container) return;
 
             // Hide all sections in current container
             container.querySelectorAll('.content-section').forEach(sec => sec.classList.add('hidden'));
 
-            // Construct specific ID based on convention: generic-id + "-s1", "-s2", or "-s3"
-            let suffix = '-s1';
-            if (currentSeason === 'season2') suffix = '-s2';
-            if (currentSeason === 'season3') suffix = '-s3';
-
-            const specificId = targetBase + suffix;
+            // Construct specific ID based on convention: generic-id + "-" + season slug
+            const specificId = `${targetBase}-${currentSeason}`;
 
             const targetSection = document.getElementById(specificId);
             if (targetSection) {
@@ -0,0 +1,75 @@
+import random
+import time
+from itertools import product
+
+import app
+from seed_db import synthetic_season
+
+
+def brute_force(points, games, spots):
+    # Definition straight from the rules: try every W/D/L result of every game
+    finals = []
+    for outcome in product(app.MATCH_OUTCOMES, repeat=len(games)):
+        final = dict(points)
+        for (home, away), (home_pts, away_pts) in zip(games, outcome):
+            final[home] += home_pts
+            final[away] += away_pts
+        finals.append(final)
+
+    status = {}
+    for team in points:
+        above = [sum(1 for n in f if n != team and f[n] > f[team]) for f in finals]
+        level_or_above = [sum(1 for n in f if n != team and f[n] >= f[team]) for f in finals]
+        if min(above) >= spots:
+            status[team] = 'eliminated'
+        elif max(level_or_above) < spots:
+            status[team] = 'clinched'
+        else:
+            status[team] = 'alive'
+    return status
+
+
+def random_league(rng):
+    names = [f"T{i}" for i in range(rng.randint(3, 6))]
+    points = {n: rng.randint(0, 12) for n in names}
+    pairs = [(h, a) for h in names for a in names if h != a]
+    games = rng.sample(pairs, min(len(pairs), rng.randint(0, 7)))
+    return points, games
+
+
+def test_matches_brute_force_on_small_leagues():
+    rng = random.Random(0)
+    for _ in range(300):
+        points, games = random_league(rng)
+        for spots in (1, 2, 3):
+            expected = brute_force(points, games, spots)
+            actual = {team: app._race_outcome(team, points, games, spots) for team in points}
+            assert actual == expected, (points, games, spots)
+
+
+def test_large_leagues_are_exact():
+    # Each of these has borderline teams that need the full search, so nothing
+    # may come back 'unknown'
+    for teams, played, seed in ((20, 0.75, 2), (24, 0.8, 1), (24, 0.8, 2)):
+        season = synthetic_season(1, teams, played, seed=seed)
+        app._race_cache.clear()
+        start = time.monotonic()
+        status = app.calculate_race_status('synthetic1', season['teams'], season['fixtures'])
+        assert time.monotonic() - start < app.RACE_TIME_BUDGET
+        assert len(status) == teams
+        assert all(s in ('clinched', 'eliminated', 'alive') for race in status.values() for s in race.values())
+
+
+def test_borderline_team_in_large_league():
+    # Winning out only keeps this team in the top 4 for a narrow set of other
+    # results, which the search has to find among 90 open games
+    season = synthetic_season(1, 20, 0.75, seed=2)
+    points, games, _ = app._race_signature(season['teams'], season['fixtures'])
+    assert app._race_outcome('Synthetic 1-011', points, games, app.KNOCKOUT_SPOTS) == 'alive'
+
+
+def test_unknown_when_search_runs_out(monkeypatch):
+    monkeypatch.setattr(app, 'RACE_NODE_BUDGET', 0)
+    season = synthetic_season(1, 20, 0.75, seed=2)
+    points, games, _ = app._race_signature(season['teams'], season['fixtures'])
+    assert app._race_outcome('Synthetic 1-011', points, games, app.KNOCKOUT_SPOTS) == 'unknown'
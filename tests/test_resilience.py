@@ -0,0 +1,136 @@
+import time
+
+import httpx
+import pytest
+from supabase import create_client, ClientOptions
+
+import app
+
+SEASON = 'season3'
+
+
+class FakeDatabase:
+    # Stands in for PostgREST behind the real BreakerTransport; `down` makes
+    # every request time out and `on_request` runs before a request is answered
+    def __init__(self):
+        self.down = False
+        self.requests = 0
+        self.teams = [{'id': 1, 'name': 'Alpha', 'points': 3}]
+        self.on_request = None
+
+    def handle(self, request):
+        self.requests += 1
+        if self.on_request:
+            self.on_request(request)
+        if self.down:
+            raise httpx.ConnectTimeout('timed out', request=request)
+        rows = self.teams if request.url.path.endswith('/teams') else []
+        return httpx.Response(200, json=rows)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDatabase()
+    monkeypatch.setattr(httpx.HTTPTransport, 'handle_request', lambda transport, request: fake.handle(request))
+    client = httpx.Client(transport=app.BreakerTransport())
+    monkeypatch.setattr(app, 'supabase', create_client('http://db.test', 'test-key', options=ClientOptions(httpx_client=client)))
+    monkeypatch.setitem(app._breaker, 'failures', 0)
+    monkeypatch.setitem(app._breaker, 'opened_at', None)
+    monkeypatch.setitem(app._breaker, 'probing', False)
+    for cache in (app._season_partitions, app._season_locks, app._season_versions, app._race_cache, app._race_locks):
+        cache.clear()
+    return fake
+
+
+def query():
+    return app.supabase.table('teams').select('*').execute().data
+
+
+def test_breaker_opens_after_repeated_failures(db):
+    db.down = True
+    for _ in range(app.DB_BREAKER_THRESHOLD):
+        with pytest.raises(httpx.ConnectTimeout):
+            query()
+
+    # Open: requests fail fast without reaching the database
+    with pytest.raises(app.DatabaseUnavailable):
+        query()
+    assert db.requests == app.DB_BREAKER_THRESHOLD
+
+
+def test_half_open_lets_one_probe_through(db):
+    db.down = True
+    for _ in range(app.DB_BREAKER_THRESHOLD):
+        with pytest.raises(httpx.ConnectTimeout):
+            query()
+    app._breaker['opened_at'] -= app.DB_BREAKER_COOLDOWN
+
+    # While the probe is in flight every other request is turned away
+    allowed_during_probe = []
+    db.on_request = lambda request: allowed_during_probe.append(app._breaker_allow())
+    with pytest.raises(httpx.ConnectTimeout):
+        query()
+    assert allowed_during_probe == [False]
+
+    # A failed probe re-opens the breaker straight away
+    db.on_request = None
+    with pytest.raises(app.DatabaseUnavailable):
+        query()
+
+    # A successful probe closes it again
+    app._breaker['opened_at'] -= app.DB_BREAKER_COOLDOWN
+    db.down = False
+    assert query() == db.teams
+    assert app._breaker['opened_at'] is None and app._breaker['failures'] == 0
+    assert query() == db.teams
+
+
+def test_stale_snapshot_served_after_invalidation_while_down(db):
+    fresh = app.get_season_data(SEASON)
+    assert fresh['teams'][0]['points'] == 3 and not fresh['stale']
+
+    app.invalidate_season(SEASON)
+    db.down = True
+    snapshot = app.get_season_data(SEASON)
+    assert snapshot['stale']
+    assert snapshot['teams'] == fresh['teams']
+    assert snapshot['as_of'] == fresh['as_of']
+
+
+def test_refresh_discarded_after_version_bump(db):
+    app.get_season_data(SEASON)
+    app.invalidate_season(SEASON)
+
+    # A write lands while the refetch is in flight and changes the data again
+    db.teams = [{'id': 1, 'name': 'Alpha', 'points': 6}]
+    db.on_request = lambda request: app.invalidate_season(SEASON)
+    app.get_season_data(SEASON)
+    assert app._season_partitions[SEASON]['expires'] == 0 # Not replaced by the outdated fetch
+
+    db.on_request = None
+    assert app.get_season_data(SEASON)['teams'][0]['points'] == 6
+
+
+def test_failed_refresh_backs_off(db):
+    app.get_season_data(SEASON)
+    app.invalidate_season(SEASON)
+    db.down = True
+    app.get_season_data(SEASON)
+    entry = app._season_partitions[SEASON]
+    assert entry['stale']
+    assert entry['expires'] > time.monotonic() + app.SEASON_RETRY_INTERVAL - 1
+
+    # Within the retry interval the snapshot is served without touching the database
+    requests = db.requests
+    for _ in range(5):
+        assert app.get_season_data(SEASON)['stale']
+    assert db.requests == requests
+
+    # After it, one background refresh picks the database back up
+    db.down = False
+    entry['expires'] = time.monotonic() - 1
+    assert app.get_season_data(SEASON)['stale'] # Served straight away, not blocked
+    deadline = time.monotonic() + 5
+    while app._season_partitions[SEASON]['stale'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not app.get_season_data(SEASON)['stale']